@@ -0,0 +1 @@
+"""AI-powered file analysis and folder reorganization."""
@@ -1,25 +1,102 @@
 import os
 import json
+import datetime
+import functools
+import shelve
+import shutil
+import tempfile
+import hashlib
 import pathlib
+import threading
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional
+import numpy as np
 import spacy
-from transformers import pipeline
+import torch
+from thinc.api import to_numpy
+from transformers import AutoTokenizer, pipeline
 from sklearn.feature_extraction.text import TfidfVectorizer
 
+from .file_walker import file_extension
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+try:
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+except ImportError:
+    ORTModelForSequenceClassification = None
+
+# Default Hugging Face model used for zero-shot purpose classification
+DEFAULT_ZERO_SHOT_MODEL = "MoritzLaurer/deberta-v3-base-mnli-fever-anli"
+
+# Sentence embedding model used for the optional semantic similarity score
+SEMANTIC_MODEL = "all-MiniLM-L6-v2"
+
+# Hypothesis paired with each purpose category, as in the zero-shot pipeline
+HYPOTHESIS_TEMPLATE = "This example is {}."
+
+# Upper bound on characters per token, used to cut premises before tokenization
+PREMISE_CHARS_PER_TOKEN = 8
+
+# spaCy pipeline components not needed for similarity scoring
+SPACY_DISABLED_COMPONENTS = ['tagger', 'parser', 'attribute_ruler', 'lemmatizer', 'ner']
+
+# Number of texts spaCy processes per batch in nlp.pipe
+SPACY_BATCH_SIZE = 64
+
+# Maximum number of bytes read from a file for classification
+MAX_CONTENT_BYTES = 100000
+
+# Number of leading bytes checked for NUL bytes to detect binary files
+BINARY_SNIFF_BYTES = 4096
+
 class FileAnalyzer:
     """
     Initialize the FileAnalyzer with NLP models for content analysis.
     
-    :param models_path: Optional path to pre-trained models
+    :param models_path: Optional path where exported models are cached, defaults to ~/.cache/ai-file-organizer/models
     :param categories_path: Optional path to categories JSON file
+    :param batch_size: Number of files classified per zero-shot forward pass
+    :param cache_dir: Directory of the zero-shot result cache; an empty string disables it
+    :param cache_size: Maximum number of zero-shot results kept in memory
+    :param n_process: Maximum number of spaCy worker processes, defaults to the CPU count
+    :param quantize: Run the zero-shot model as int8 ONNX on CPU when optimum is installed
+    :param model_id: Hugging Face NLI model used for zero-shot classification
+    :param use_semantic: Blend a sentence-embedding similarity score into the zero-shot scores
     """
-    def __init__(self, models_path: str = None, categories_path: str = None):
+    def __init__(self, models_path: str = None, categories_path: str = None, batch_size: int = 32,
+                 cache_dir: Optional[str] = None, cache_size: int = 4096, n_process: Optional[int] = None,
+                 quantize: bool = True, model_id: str = DEFAULT_ZERO_SHOT_MODEL, use_semantic: bool = False):
+        if models_path is None:
+            models_path = os.path.join(os.path.expanduser('~'), '.cache', 'ai-file-organizer', 'models')
+        self.models_path = models_path
+        self.quantize = quantize
+        self.model_id = model_id
+        self.use_semantic = use_semantic
+        self.batch_size = batch_size
+        self.n_process = n_process or os.cpu_count() or 1
        
-        # Load classification categories
+        # Load classification categories; NLP and ML models load on first use
         self._load_classification_config(categories_path)
-        
-        # Initialize NLP and ML models
-        self._initialize_nlp_models()
+
+        # Guards the shared zero-shot model so one analyzer can serve many threads
+        self._model_lock = threading.RLock()
+        self._classifier = None
+
+        # Pick the zero-shot backend up front; its precision affects the scores
+        if torch.cuda.is_available():
+            self._zero_shot_backend = 'cuda-fp16'
+        elif self.quantize and ORTModelForSequenceClassification is not None:
+            self._zero_shot_backend = 'onnx-int8'
+        else:
+            self._zero_shot_backend = 'cpu-fp32'
+
+        # Open the zero-shot result cache
+        self._open_classification_cache(cache_dir, cache_size)
 
     """
     Load classification categories from a JSON configuration file.
@@ -42,7 +119,7 @@ class FileAnalyzer:
         if categories_path is None:
             categories_path = os.path.join(
                 os.path.dirname(__file__), 
-                '..', 'resources', 'config.json'
+                'resources', 'config.json'
             )
         
         try:
@@ -68,29 +145,366 @@ class FileAnalyzer:
             raise ValueError(f"Invalid JSON in configuration file: {e}")
 
     """
-    Initialize Natural Language Processing and Machine Learning models.
-    
-    Sets up spaCy for text processing and Hugging Face for zero-shot classification.
+    spaCy model for basic text processing, loaded on first use.
+
+    Runs on the GPU when one is available. Only the tok2vec output backs
+    the document vectors, so the remaining components are skipped.
     Handles model download if not already present.
     """
-    def _initialize_nlp_models(self) -> None:
-
-        # Initialize spaCy model for basic text processing
+    @functools.cached_property
+    def nlp(self) -> spacy.language.Language:
+        self._spacy_on_gpu = spacy.prefer_gpu()
         try:
-            self.nlp = spacy.load('en_core_web_sm')
+            return spacy.load('en_core_web_sm', disable=SPACY_DISABLED_COMPONENTS)
         except OSError:
             print("Downloading spaCy model...")
             spacy.cli.download('en_core_web_sm')
-            self.nlp = spacy.load('en_core_web_sm')
-        
-        # Initialize Hugging Face zero-shot classification pipeline
-        self.classifier = pipeline(
-            "zero-shot-classification", 
-            model="facebook/bart-large-mnli"
+            return spacy.load('en_core_web_sm', disable=SPACY_DISABLED_COMPONENTS)
+
+    """
+    Hugging Face zero-shot classification pipeline, loaded on first use.
+
+    Also tokenizes the hypotheses once; premises are paired with them per file.
+    Threads racing on first use wait for a single load under _model_lock.
+    """
+    @property
+    def classifier(self):
+        if self._classifier is None:
+            with self._model_lock:
+                if self._classifier is None:
+                    classifier = self._load_zero_shot_classifier()
+                    self._prepare_zero_shot_inputs(classifier)
+                    self._classifier = classifier
+        return self._classifier
+
+    """
+    Sentence embedding model for semantic similarity, loaded on first use.
+
+    None when sentence-transformers is not installed, in which case the
+    spaCy document vectors are used instead.
+    """
+    @functools.cached_property
+    def _sentence_encoder(self):
+        if SentenceTransformer is None:
+            return None
+        return SentenceTransformer(SEMANTIC_MODEL)
+
+    """
+    Normalized sentence embeddings of the purpose categories.
+    """
+    @functools.cached_property
+    def _cat_embeddings(self) -> np.ndarray:
+        return self._sentence_encoder.encode(self.purpose_categories, normalize_embeddings=True)
+
+    """
+    TF-IDF vectorizer for content similarity, created on first use.
+    """
+    @functools.cached_property
+    def vectorizer(self) -> TfidfVectorizer:
+        return TfidfVectorizer(stop_words='english')
+
+    """
+    Category vectors precomputed once for semantic similarity scoring.
+    """
+    @functools.cached_property
+    def _cat_vecs(self) -> np.ndarray:
+        return np.stack([to_numpy(self.nlp(category).vector) for category in self.purpose_categories])
+
+    """
+    L2 norms of the category vectors.
+    """
+    @functools.cached_property
+    def _cat_norms(self) -> np.ndarray:
+        return np.linalg.norm(self._cat_vecs, axis=1)
+
+    """
+    Create the zero-shot classification pipeline.
+
+    Runs in half precision on the first GPU when one is available. On CPU,
+    the model is exported to ONNX and dynamically quantized to int8 with
+    optimum, which is several times faster; the quantized model is cached
+    under models_path. The PyTorch model is used when optimum is not
+    installed, and as a fallback when the export fails.
+
+    :return: Hugging Face zero-shot classification pipeline
+    """
+    def _load_zero_shot_classifier(self):
+        if self._zero_shot_backend == 'cuda-fp16':
+            return pipeline(
+                "zero-shot-classification", 
+                model=self.model_id,
+                device=0,
+                torch_dtype=torch.float16
+            )
+
+        if self._zero_shot_backend == 'cpu-fp32':
+            return pipeline("zero-shot-classification", model=self.model_id, device=-1)
+
+        try:
+            quantized_path = self.prepare_quantized_model()
+            model = ORTModelForSequenceClassification.from_pretrained(
+                quantized_path, 
+                file_name='model_quantized.onnx'
+            )
+            return pipeline(
+                "zero-shot-classification", 
+                model=model,
+                tokenizer=AutoTokenizer.from_pretrained(quantized_path)
+            )
+        except Exception as e:
+            print(f"Quantized zero-shot model unavailable, using PyTorch model: {e}")
+            self._zero_shot_backend = 'cpu-fp32'
+            self._cache_salt = self._make_cache_salt()
+            return pipeline("zero-shot-classification", model=self.model_id, device=-1)
+
+    """
+    Export and quantize the zero-shot model to int8 ONNX unless already done.
+
+    The model is built in a temporary directory next to its final location
+    and renamed into place once complete, so concurrent processes never
+    load a partially written model. When several finish, the first rename
+    wins and the other builds are discarded. Does nothing unless the
+    analyzer runs the quantized backend.
+
+    :return: Directory holding the quantized model and its tokenizer, or None
+    """
+    def prepare_quantized_model(self) -> Optional[str]:
+        if self._zero_shot_backend != 'onnx-int8':
+            return None
+
+        quantized_path = os.path.join(self.models_path, self.model_id.replace('/', '--') + '-int8')
+        quantized_model = os.path.join(quantized_path, 'model_quantized.onnx')
+        if os.path.isfile(quantized_model):
+            return quantized_path
+
+        os.makedirs(self.models_path, exist_ok=True)
+        build_path = tempfile.mkdtemp(prefix=os.path.basename(quantized_path) + '.', dir=self.models_path)
+        try:
+            print("Quantizing zero-shot model...")
+            self._export_quantized_model(build_path)
+            try:
+                os.replace(build_path, quantized_path)
+            except OSError:
+                # Another process may have finished first; otherwise replace
+                # an incomplete directory left behind by an interrupted export
+                if not os.path.isfile(quantized_model):
+                    shutil.rmtree(quantized_path, ignore_errors=True)
+                    os.replace(build_path, quantized_path)
+        finally:
+            shutil.rmtree(build_path, ignore_errors=True)
+
+        return quantized_path
+
+    """
+    Export the zero-shot model to ONNX and quantize it to int8.
+
+    :param save_dir: Directory receiving the exported model, its quantized
+        version and the tokenizer
+    """
+    def _export_quantized_model(self, save_dir: str) -> None:
+        model = ORTModelForSequenceClassification.from_pretrained(self.model_id, export=True)
+        model.save_pretrained(save_dir)
+        AutoTokenizer.from_pretrained(self.model_id).save_pretrained(save_dir)
+        ORTQuantizer.from_pretrained(model).quantize(
+            save_dir=save_dir,
+            quantization_config=AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
         )
-        
-        # Initialize TF-IDF Vectorizer for content similarity
-        self.vectorizer = TfidfVectorizer(stop_words='english')
+
+    """
+    Precompute the model inputs shared by every zero-shot classification.
+
+    Tokenizes one hypothesis per purpose category and resolves the
+    entailment and contradiction logits the same way the Hugging Face
+    zero-shot pipeline does.
+
+    :param classifier: Freshly loaded zero-shot classification pipeline
+    """
+    def _prepare_zero_shot_inputs(self, classifier) -> None:
+        tokenizer = classifier.tokenizer
+        model_config = classifier.model.config
+
+        self._hypothesis_ids = [
+            tokenizer(HYPOTHESIS_TEMPLATE.format(category), add_special_tokens=False)['input_ids']
+            for category in self.purpose_categories
+        ]
+
+        # Leave room for the longest hypothesis and the special tokens of a pair
+        max_length = min(tokenizer.model_max_length, getattr(model_config, 'max_position_embeddings', 512))
+        self._max_premise_length = (
+            max_length
+            - max(len(ids) for ids in self._hypothesis_ids)
+            - tokenizer.num_special_tokens_to_add(pair=True)
+        )
+
+        self._entailment_id = next(
+            (label_id for label, label_id in model_config.label2id.items() if label.lower().startswith('entail')),
+            -1
+        )
+        self._contradiction_id = -1 if self._entailment_id == 0 else 0
+
+    """
+    Score every purpose category against each content with the NLI model.
+
+    Each premise is cut to roughly the model's input length, tokenized once
+    and concatenated with the pre-tokenized hypotheses, instead of letting
+    the pipeline re-tokenize the whole premise for every category. Pairs are
+    run through the model batch_size at a time. Calls from several threads
+    are serialized, since the fast tokenizer is not safe to share
+    concurrently; each forward pass already uses every core.
+
+    :param file_contents: Non-empty textual contents to classify
+    :return: Entailment probability per purpose category for each content
+    """
+    def _zero_shot_scores(self, file_contents: List[str]) -> List[Dict[str, float]]:
+        with self._model_lock, torch.inference_mode():
+            tokenizer = self.classifier.tokenizer
+            model = self.classifier.model
+
+            # Cut premises to what the model can see before tokenizing them
+            max_premise_chars = self._max_premise_length * PREMISE_CHARS_PER_TOKEN
+            premise_ids = tokenizer(
+                [content[:max_premise_chars] for content in file_contents], 
+                add_special_tokens=False, 
+                truncation=True, 
+                max_length=self._max_premise_length
+            )['input_ids']
+            pairs = [(premise, hypothesis) for premise in premise_ids for hypothesis in self._hypothesis_ids]
+
+            entailment_scores = []
+            for start in range(0, len(pairs), self.batch_size):
+                features = []
+                for premise, hypothesis in pairs[start:start + self.batch_size]:
+                    feature = {'input_ids': tokenizer.build_inputs_with_special_tokens(premise, hypothesis)}
+                    if 'token_type_ids' in tokenizer.model_input_names:
+                        feature['token_type_ids'] = tokenizer.create_token_type_ids_from_sequences(premise, hypothesis)
+                    features.append(feature)
+
+                inputs = tokenizer.pad(features, return_tensors='pt')
+                inputs = {name: tensor.to(self.classifier.device) for name, tensor in inputs.items()}
+                logits = model(**inputs).logits.float()
+
+                # Multi-label scoring: softmax over contradiction vs. entailment per pair
+                entail_contr_logits = logits[:, [self._contradiction_id, self._entailment_id]]
+                entailment_scores.extend(entail_contr_logits.softmax(dim=-1)[:, 1].tolist())
+
+            num_categories = len(self.purpose_categories)
+            return [
+                dict(zip(self.purpose_categories, entailment_scores[i * num_categories:(i + 1) * num_categories]))
+                for i in range(len(file_contents))
+            ]
+
+    """
+    Open the content-hash keyed cache of zero-shot classification results.
+
+    Results are kept in a bounded in-memory LRU backed by an on-disk shelve,
+    so duplicate files and re-runs skip the transformer forward pass.
+
+    :param cache_dir: Directory holding the cache database, defaults to ~/.cache/ai-file-organizer
+    :param cache_size: Maximum number of results kept in memory
+    """
+    def _open_classification_cache(self, cache_dir: Optional[str], cache_size: int) -> None:
+        self._memory_cache = OrderedDict()
+        self._embedding_cache = OrderedDict()
+        self._memory_cache_size = cache_size
+        self._cache_lock = threading.Lock()
+        self._disk_cache = None
+
+        self._cache_salt = self._make_cache_salt()
+
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.expanduser('~'), '.cache', 'ai-file-organizer')
+        if not cache_dir:
+            return
+
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._disk_cache = shelve.open(os.path.join(cache_dir, 'zs.db'))
+        except Exception as e:
+            print(f"Classification cache unavailable, continuing without it: {e}")
+
+    """
+    Build the prefix hashed into every cache key.
+
+    Scores depend on the model, its backend and precision, and the candidate
+    labels, so results of one configuration are never served to another.
+
+    :return: Salt bytes for _cache_key
+    """
+    def _make_cache_salt(self) -> bytes:
+        return '\x00'.join([self.model_id, self._zero_shot_backend] + self.purpose_categories).encode('utf-8')
+
+    """
+    Flush and close the on-disk classification cache.
+
+    Must be called once the analyzer is no longer needed, unless it is used
+    as a context manager or was created with an empty cache_dir.
+    """
+    def close(self) -> None:
+        with self._cache_lock:
+            if self._disk_cache is not None:
+                self._disk_cache.close()
+                self._disk_cache = None
+
+    def __enter__(self) -> 'FileAnalyzer':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    """
+    Compute the cache key of a file content.
+
+    :param file_content: Textual content of the file
+    :return: Hex SHA-256 digest of the content and the candidate labels
+    """
+    def _cache_key(self, file_content: str) -> str:
+        digest = hashlib.sha256(self._cache_salt)
+        digest.update(b'\x00')
+        digest.update(file_content.encode('utf-8', errors='surrogatepass'))
+        return digest.hexdigest()
+
+    """
+    Look up cached zero-shot scores.
+
+    :param key: Cache key from _cache_key
+    :return: Zero-shot scores keyed by purpose category, or None on a miss
+    """
+    def _cache_get(self, key: str) -> Optional[Dict[str, float]]:
+        with self._cache_lock:
+            if key in self._memory_cache:
+                self._memory_cache.move_to_end(key)
+                return self._memory_cache[key]
+            if self._disk_cache is None:
+                return None
+            classifications = self._disk_cache.get(key)
+            if classifications is not None:
+                self._remember(self._memory_cache, key, classifications)
+            return classifications
+
+    """
+    Store zero-shot scores in the memory and disk caches.
+
+    :param key: Cache key from _cache_key
+    :param classifications: Zero-shot scores keyed by purpose category
+    """
+    def _cache_put(self, key: str, classifications: Dict[str, float]) -> None:
+        with self._cache_lock:
+            self._remember(self._memory_cache, key, classifications)
+            if self._disk_cache is not None:
+                self._disk_cache[key] = classifications
+
+    """
+    Insert a value into an in-memory LRU, evicting the least recently used entries.
+
+    :param cache: In-memory LRU to insert into
+    :param key: Cache key from _cache_key
+    :param value: Value to cache
+    """
+    def _remember(self, cache: OrderedDict, key: str, value: Any) -> None:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self._memory_cache_size:
+            cache.popitem(last=False)
 
     """
     Extract comprehensive metadata for a given file.
@@ -99,19 +513,23 @@ class FileAnalyzer:
     modification time, and creation year.
     
     :param file_path: Path to the file to extract metadata from
+    :param stats: Optional stat result already obtained while scanning the directory
     :return: Dictionary containing file metadata
     :raises Exception: If file metadata cannot be accessed
     """
-    def extract_metadata(self, file_path: pathlib.Path) -> Dict[str, Any]:  
+    def extract_metadata(self, file_path: pathlib.Path, stats: Optional[os.stat_result] = None) -> Dict[str, Any]:  
         try:
-            stats = file_path.stat()
+            if stats is None:
+                stats = file_path.stat()
+            name = file_path.name
+            extension = file_extension(name)
             return {
-                'name': file_path.name,
-                'extension': file_path.suffix,
+                'name': name,
+                'extension': f'.{extension}' if extension else '',
                 'size': stats.st_size,
                 'created': stats.st_ctime,
                 'modified': stats.st_mtime,
-                'year': pathlib.Path(file_path).stat().st_ctime_ns // (10**9) // 31536000 + 1970
+                'year': datetime.datetime.fromtimestamp(stats.st_ctime).year
             }
         except Exception as e:
             print(f"Error extracting metadata for {file_path}: {e}")
@@ -123,7 +541,7 @@ class FileAnalyzer:
     Utilizes multiple classification techniques to provide a comprehensive
     and nuanced file purpose classification:
     1. Zero-shot classification
-    2. Semantic similarity
+    2. Semantic similarity (when use_semantic is enabled)
     3. Confidence-weighted scoring
 
     :param file_content: Textual content of the file to classify
@@ -132,44 +550,167 @@ class FileAnalyzer:
     :raises Exception: If classification pipeline encounters an error
     """
     def classify_file_purpose(self, file_content: str, confidence_threshold: float = 0.5) -> Dict[str, float]:
+        # Nothing to classify, so avoid loading the models
+        if not file_content.strip():
+            return {}
+        return self.classify_file_purposes([file_content], confidence_threshold)[0]
+
+    """
+    Batched variant of classify_file_purpose.
+
+    Sends all non-empty contents through the zero-shot pipeline in a single
+    call so the model scores many (premise, hypothesis) pairs per forward pass.
+
+    :param file_contents: Textual contents of the files to classify
+    :param confidence_threshold: Minimum confidence score to include a category
+    :return: One dictionary of purpose categories per input, in input order
+    """
+    def classify_file_purposes(self, file_contents: List[str], confidence_threshold: float = 0.5) -> List[Dict[str, float]]:
+        results = [{} for _ in file_contents]
+
+        # Empty files have nothing to classify and would fail the whole batch
+        indices = [i for i, content in enumerate(file_contents) if content.strip()]
+        if not indices:
+            return results
+
+        # Reuse cached scores for contents that were already classified
+        keys = {i: self._cache_key(file_contents[i]) for i in indices}
+        classifications = {i: self._cache_get(keys[i]) for i in indices}
+        misses = [i for i in indices if classifications[i] is None]
+
         try:
-            # Perform zero-shot classification
-            zero_shot_result = self.classifier(
-                file_content, 
-                self.purpose_categories, 
-                multi_label=True
-            )
-            
-            # Create initial classification dictionary
-            classifications = dict(zip(
-                zero_shot_result['labels'], 
-                zero_shot_result['scores']
-            ))
-            
-            # Enhance with semantic similarity
-            doc = self.nlp(file_content)
+            if misses:
+                # Perform zero-shot classification for the whole batch
+                zero_shot_scores = self._zero_shot_scores([file_contents[i] for i in misses])
+
+                # Loading the model may have switched backends, so rekey the results
+                for i, scores in zip(misses, zero_shot_scores):
+                    classifications[i] = scores
+                    self._cache_put(self._cache_key(file_contents[i]), scores)
+
+            # Optionally enhance with semantic similarity
             semantic_scores = {}
-            for category in self.purpose_categories:
-                category_doc = self.nlp(category)
-                semantic_scores[category] = doc.similarity(category_doc)
-            
-            # Combine and weight scores
-            final_scores = {}
-            for category in self.purpose_categories:
-                zero_shot_score = classifications.get(category, 0)
-                semantic_score = semantic_scores.get(category, 0)
-                
-                # Weighted combination of scores
-                final_score = (0.7 * zero_shot_score) + (0.3 * semantic_score)
-                
-                if final_score >= confidence_threshold:
-                    final_scores[category] = final_score
+            if self.use_semantic:
+                semantic_scores = dict(zip(indices, self._semantic_scores(
+                    [file_contents[i] for i in indices], 
+                    [keys[i] for i in indices]
+                )))
+
+            for i in indices:
+                results[i] = self._combine_scores(classifications[i], semantic_scores.get(i), confidence_threshold)
             
-            return final_scores
+            return results
         
         except Exception as e:
             print(f"Advanced classification error: {e}")
-            return {}
+            return [{} for _ in file_contents]
+
+    """
+    Compute the semantic similarity of each content to every purpose category.
+
+    Uses a sentence embedding per file, cached by content hash, compared with
+    the precomputed category embeddings. Falls back to spaCy document vectors
+    when sentence-transformers is not installed.
+
+    :param file_contents: Non-empty textual contents to score
+    :param keys: Cache keys of the contents from _cache_key
+    :return: Similarity per purpose category for each content
+    """
+    def _semantic_scores(self, file_contents: List[str], keys: List[str]) -> List[Dict[str, float]]:
+        if self._sentence_encoder is None:
+            return self._spacy_similarity_scores(file_contents)
+
+        with self._cache_lock:
+            embeddings = [self._embedding_cache.get(key) for key in keys]
+        misses = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if misses:
+            encoded = self._sentence_encoder.encode(
+                [file_contents[i] for i in misses], 
+                batch_size=self.batch_size, 
+                normalize_embeddings=True
+            )
+            with self._cache_lock:
+                for i, embedding in zip(misses, encoded):
+                    embeddings[i] = embedding
+                    self._remember(self._embedding_cache, keys[i], embedding)
+
+        similarities = np.stack(embeddings) @ self._cat_embeddings.T
+        return [dict(zip(self.purpose_categories, row.tolist())) for row in similarities]
+
+    """
+    Compute semantic similarity from spaCy document vectors.
+
+    :param file_contents: Non-empty textual contents to score
+    :return: Similarity per purpose category for each content
+    """
+    def _spacy_similarity_scores(self, file_contents: List[str]) -> List[Dict[str, float]]:
+        # Process all contents with spaCy in batches, forking workers only
+        # when there are enough batches to keep them busy. Worker
+        # processes cannot share the GPU, so GPU runs stay in-process.
+        nlp = self.nlp
+        n_process = max(1, min(self.n_process, len(file_contents) // SPACY_BATCH_SIZE))
+        if self._spacy_on_gpu:
+            n_process = 1
+        docs = nlp.pipe(file_contents, batch_size=SPACY_BATCH_SIZE, n_process=n_process)
+
+        scores = []
+        for doc in docs:
+            # Compare with the precomputed category vectors
+            doc_vec = to_numpy(doc.vector)
+            similarities = self._cat_vecs @ doc_vec / (self._cat_norms * np.linalg.norm(doc_vec) + 1e-9)
+            scores.append(dict(zip(self.purpose_categories, similarities.tolist())))
+        return scores
+
+    """
+    Combine zero-shot and optional semantic scores and apply the threshold.
+
+    :param classifications: Zero-shot scores keyed by purpose category
+    :param semantic_scores: Optional semantic similarity keyed by purpose category
+    :param confidence_threshold: Minimum confidence score to include a category
+    :return: Dictionary of purpose categories with their confidence scores
+    """
+    def _combine_scores(self, classifications: Dict[str, float], semantic_scores: Optional[Dict[str, float]],
+                        confidence_threshold: float) -> Dict[str, float]:
+        # Combine and weight scores
+        final_scores = {}
+        for category in self.purpose_categories:
+            zero_shot_score = classifications.get(category, 0)
+            
+            # Weighted combination of scores
+            if semantic_scores is None:
+                final_score = zero_shot_score
+            else:
+                final_score = (0.7 * zero_shot_score) + (0.3 * semantic_scores.get(category, 0))
+            
+            if final_score >= confidence_threshold:
+                final_scores[category] = final_score
+        
+        return final_scores
+
+    """
+    Read the textual content of a file.
+
+    Reads a small head first and gives up on files containing NUL bytes,
+    so binary files cost a single 4KB read. Text files are read up to
+    MAX_CONTENT_BYTES, which is more than the classification models can use.
+
+    :param file_path: Path to the file to read
+    :return: File content, or an empty string for binary or unreadable files
+    """
+    def read_content(self, file_path: pathlib.Path) -> str:
+        try:
+            fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+            try:
+                head = os.read(fd, BINARY_SNIFF_BYTES)
+                if b'\x00' in head:
+                    return ""
+                data = head + os.read(fd, MAX_CONTENT_BYTES - len(head))
+            finally:
+                os.close(fd)
+            return data.decode('utf-8', errors='replace')
+        except Exception as e:
+            print(f"Error reading file {file_path}: {e}")
+            return ""
 
     """
     Perform comprehensive file analysis.
@@ -181,33 +722,39 @@ class FileAnalyzer:
     :return: Detailed file analysis results
     """
     def analyze_file(self, file_path: pathlib.Path) -> Dict[str, Any]:
-        """
-        Perform comprehensive file analysis.
-        
-        Extracts file metadata, classifies purpose, and provides content preview.
-        Uses advanced multi-model classification approach.
-        
-        :param file_path: Path to the file to analyze
-        :return: Detailed file analysis results
-        """
-        # Extract metadata
-        metadata = self.extract_metadata(file_path)
-        
-        # Read file content
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except Exception as e:
-            print(f"Error reading file {file_path}: {e}")
-            content = ""
+        return self.analyze_files([file_path])[0]
+
+    """
+    Perform comprehensive analysis of several files at once.
+
+    Reads every file first, then classifies all contents in one batched
+    zero-shot call and zips the scores back with each file's metadata.
+
+    :param file_paths: Paths to the files to analyze
+    :param contents: Optional contents already read with read_content
+    :param stats: Optional stat results already obtained while scanning the directory
+    :return: Detailed file analysis results, in input order
+    """
+    def analyze_files(self, file_paths: List[pathlib.Path], contents: Optional[List[str]] = None,
+                      stats: Optional[List[Optional[os.stat_result]]] = None) -> List[Dict[str, Any]]:
+        # Extract metadata and read file contents
+        if stats is None:
+            stats = [None] * len(file_paths)
+        metadata = [self.extract_metadata(file_path, file_stats) for file_path, file_stats in zip(file_paths, stats)]
+        if contents is None:
+            contents = [self.read_content(file_path) for file_path in file_paths]
         
-        # Classify file purpose with advanced multi-model approach
-        purposes = self.classify_file_purpose(content)
+        # Classify file purposes with advanced multi-model approach
+        purposes = self.classify_file_purposes(contents)
         
-        return {
-            'path': str(file_path),
-            'metadata': metadata,
-            'purposes': purposes,
-            'content_preview': content[:500],  # Preview first 500 chars
-            'classification_method': 'advanced_multi_model'
-        }
+        return [
+            {
+                'path': str(file_path),
+                'metadata': file_metadata,
+                'purposes': file_purposes,
+                'content_preview': content[:500],  # Preview first 500 chars
+                'classification_method': 'advanced_multi_model'
+            }
+            for file_path, file_metadata, content, file_purposes
+            in zip(file_paths, metadata, contents, purposes)
+        ]
@@ -1,46 +1,262 @@
 import os
 import json
+import queue
 import pathlib
-from typing import List, Optional
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import BinaryIO, Iterator, List, Optional, Tuple
 
-from file_analyzer import FileAnalyzer
+import torch
+
+from .file_analyzer import FileAnalyzer
+from .file_walker import file_extension, iter_files
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Number of threads reading file contents ahead of classification. Reads
+# release the GIL, so the pool is sized past the core count up to the disk
+# concurrency limit.
+READ_WORKERS = min(32, (os.cpu_count() or 4) * 4)
+
+# Name of the newline-delimited JSON file collecting all analysis results
+ANALYSES_FILENAME = 'analyses.ndjson'
+
+# Maximum number of files read ahead of classification
+PREFETCH_SIZE = 256
+
+# Number of files each worker process analyzes per task
+WORKER_CHUNK_SIZE = 32
+
+# FileAnalyzer owned by the current worker process
+_worker_analyzer = None
+
+# Extensions of files that never contain analyzable text
+BINARY_EXTENSIONS = frozenset({
+    'jpg', 'jpeg', 'png', 'gif', 'bmp', 'tiff', 'ico', 'webp', 'heic',
+    'mp3', 'wav', 'flac', 'ogg', 'm4a', 'mp4', 'mov', 'avi', 'mkv', 'webm',
+    'zip', 'rar', '7z', 'tar', 'gz', 'bz2', 'xz',
+    'exe', 'dll', 'so', 'dylib', 'o', 'a', 'pyc', 'class', 'jar',
+    'ttf', 'otf', 'woff', 'woff2', 'iso', 'dmg', 'bin',
+})
 
 """
 Process files in a given directory using FileAnalyzer.
 
+Runs a three-stage pipeline so disk I/O overlaps with inference: a thread
+pool prefetches file contents, the calling thread classifies them in
+batches, and a background thread writes the results. With more than one
+process, chunks of files are instead sharded across worker processes that
+each hold their own models, which scales CPU-bound inference across cores.
+
+Results are saved as one JSON object per line in a single analyses.ndjson
+file, in the order the files were scanned.
+
 Args:
     directory: Directory containing files to analyze
     output_dir: Optional directory to save analysis results
+    processes: Number of worker processes; 1 analyzes in this process
 
 Returns:
     List of file analysis results
 """
-def process_files(directory: pathlib.Path, output_dir: Optional[pathlib.Path] = None) -> List[dict]:
-    # Initialize FileAnalyzer
-    analyzer = FileAnalyzer()
+def process_files(directory: pathlib.Path, output_dir: Optional[pathlib.Path] = None,
+                  processes: int = 1) -> List[dict]:
+    # Collect files first so they can be classified in batches
+    entries = list(_iter_text_files(directory))
     
-    # Create output directory if specified
+    # Open the results file if an output directory is specified
+    output_file = None
     if output_dir:
         output_dir.mkdir(parents=True, exist_ok=True)
+        output_file = open(output_dir / ANALYSES_FILENAME, 'wb')
     
-    # Store analysis results
-    analysis_results = []
+    try:
+        if processes > 1:
+            return _process_files_in_workers(entries, output_file, processes)
+        return _process_files_pipelined(directory, entries, output_file)
+    finally:
+        if output_file:
+            output_file.close()
+
+"""
+Analyze files in this process with the read -> classify -> write pipeline.
+"""
+def _process_files_pipelined(directory: pathlib.Path, entries: List[os.DirEntry],
+                             output_file: Optional[BinaryIO]) -> List[dict]:
+    # Initialize FileAnalyzer; leaving the block flushes cached results to disk
+    with FileAnalyzer() as analyzer:
+        # Store analysis results
+        analysis_results = []
     
-    # Iterate through files in the directory
-    for file_path in directory.rglob('*'):
-        if file_path.is_file():
-            try:
-                # Analyze the file
-                file_analysis = analyzer.analyze_file(file_path)
-                analysis_results.append(file_analysis)
-                
-                # Optionally save results to output directory
-                if output_dir:
-                    result_filename = output_dir / f"{file_path.stem}_analysis.json"
-                    with open(result_filename, 'w') as f:
-                        json.dump(file_analysis, f, indent=4)
+        read_queue = queue.Queue(maxsize=PREFETCH_SIZE)
+        # A single writer thread keeps the results file in scan order
+        with ThreadPoolExecutor(max_workers=READ_WORKERS) as reader_pool, \
+                ThreadPoolExecutor(max_workers=1) as writer:
+            # Stage 1: read file contents ahead of classification
+            prefetcher = threading.Thread(
+                target=_prefetch_contents,
+                args=(analyzer, entries, reader_pool, read_queue),
+                daemon=True
+            )
+            prefetcher.start()
+        
+            # Stage 2: classify batches as soon as their contents are available
+            finished = False
+            while not finished:
+                batch, finished = _next_batch(read_queue, analyzer.batch_size)
+                if not batch:
+                    continue
+            
+                batch_paths = [file_path for file_path, _ in batch]
+                batch_stats, batch_contents = zip(*(loaded.result() for _, loaded in batch))
+                try:
+                    file_analyses = analyzer.analyze_files(batch_paths, list(batch_contents), list(batch_stats))
+                except Exception as e:
+                    print(f"Error analyzing files in {directory}: {e}")
+                    continue
+            
+                analysis_results.extend(file_analyses)
             
-            except Exception as e:
-                print(f"Error analyzing {file_path}: {e}")
+                # Stage 3: optionally save results in the background
+                if output_file:
+                    writer.submit(_save_analyses, output_file, file_analyses)
+        
+            prefetcher.join()
     
     return analysis_results
+
+"""
+Analyze files across worker processes.
+
+Files are sent in chunks so each worker still batches its inference,
+together with the stat results of their directory entries so workers do
+not stat them again. Results keep the order of the scanned files and are
+saved by this process.
+"""
+def _process_files_in_workers(entries: List[os.DirEntry], output_file: Optional[BinaryIO],
+                              processes: int) -> List[dict]:
+    files = [(entry.path, _entry_stat(entry)) for entry in entries]
+    chunks = [files[start:start + WORKER_CHUNK_SIZE] for start in range(0, len(files), WORKER_CHUNK_SIZE)]
+    
+    # Build the quantized model once here so workers do not all export it at the same time
+    try:
+        FileAnalyzer(cache_dir='').prepare_quantized_model()
+    except Exception as e:
+        print(f"Could not prepare the quantized model, workers will retry: {e}")
+    
+    analysis_results = []
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker) as executor:
+        for file_analyses in executor.map(_analyze_chunk, chunks):
+            analysis_results.extend(file_analyses)
+            if output_file:
+                _save_analyses(output_file, file_analyses)
+    
+    return analysis_results
+
+"""
+Create the FileAnalyzer of a worker process.
+
+Each worker runs single-threaded torch and spaCy to avoid oversubscribing
+the cores, and keeps its classification cache in memory only since the
+on-disk cache cannot be shared between processes.
+"""
+def _init_worker() -> None:
+    global _worker_analyzer
+    torch.set_num_threads(1)
+    _worker_analyzer = FileAnalyzer(n_process=1, cache_dir='')
+
+"""
+Analyze a chunk of (path, stat result) pairs in a worker process.
+"""
+def _analyze_chunk(files: List[Tuple[str, Optional[os.stat_result]]]) -> List[dict]:
+    paths = [pathlib.Path(file_path) for file_path, _ in files]
+    try:
+        return _worker_analyzer.analyze_files(paths, stats=[stats for _, stats in files])
+    except Exception as e:
+        print(f"Error analyzing files in {paths[0].parent}: {e}")
+        return []
+
+"""
+Recursively yield the files under root that may contain text.
+
+Files with a known binary extension are skipped without being opened.
+"""
+def _iter_text_files(root: pathlib.Path) -> Iterator[os.DirEntry]:
+    for entry in iter_files(root):
+        if file_extension(entry.name).lower() not in BINARY_EXTENSIONS:
+            yield entry
+
+"""
+Submit file reads to the reader pool and queue them in file order.
+
+The bounded queue limits how far reads run ahead of classification.
+A final None marks the end of the files.
+"""
+def _prefetch_contents(analyzer: FileAnalyzer, entries: List[os.DirEntry],
+                       reader_pool: ThreadPoolExecutor, read_queue: queue.Queue) -> None:
+    for entry in entries:
+        read_queue.put((pathlib.Path(entry.path), reader_pool.submit(_load_entry, analyzer, entry)))
+    read_queue.put(None)
+
+"""
+Stat and read a scanned file.
+
+Returns:
+    The stat result, or None if it could not be obtained, and the file content
+"""
+def _load_entry(analyzer: FileAnalyzer, entry: os.DirEntry) -> Tuple[Optional[os.stat_result], str]:
+    return _entry_stat(entry), analyzer.read_content(entry.path)
+
+"""
+Get the stat result of a scanned file.
+
+DirEntry caches the result, and on Windows it comes from the directory
+listing itself without a syscall.
+
+Returns:
+    The stat result, or None if it could not be obtained
+"""
+def _entry_stat(entry: os.DirEntry) -> Optional[os.stat_result]:
+    try:
+        return entry.stat()
+    except OSError:
+        return None
+
+"""
+Take the next batch of prefetched files from the read queue.
+
+The batch grows beyond batch_size, up to four times, when reads are
+running ahead of classification and the queue is backing up.
+
+Returns:
+    The batch of (path, loaded file future) pairs and whether the end was reached
+"""
+def _next_batch(read_queue: queue.Queue, batch_size: int) -> Tuple[List[Tuple[pathlib.Path, Future]], bool]:
+    target = min(max(batch_size, read_queue.qsize()), batch_size * 4)
+    batch = []
+    while len(batch) < target:
+        item = read_queue.get()
+        if item is None:
+            return batch, True
+        batch.append(item)
+    return batch, False
+
+"""
+Append file analyses to the results file, one JSON object per line.
+"""
+def _save_analyses(output_file: BinaryIO, file_analyses: List[dict]) -> None:
+    try:
+        output_file.write(b''.join(_dump_json(file_analysis) + b'\n' for file_analysis in file_analyses))
+    except Exception as e:
+        print(f"Error saving analyses to {output_file.name}: {e}")
+
+"""
+Serialize a file analysis to JSON bytes, using orjson when it is installed.
+"""
+def _dump_json(file_analysis: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(file_analysis)
+    return json.dumps(file_analysis, separators=(',', ':')).encode('utf-8')
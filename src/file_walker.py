@@ -0,0 +1,46 @@
+import os
+from typing import Iterator, Union
+
+"""
+Yield every regular file below a directory.
+
+Walks the tree with an explicit stack of os.scandir calls. DirEntry.is_dir
+and DirEntry.is_file reuse the file type reported by the directory listing,
+so no stat is issued per entry. Symlinks are not followed. Directories
+that cannot be read are skipped, as with Path.rglob.
+
+Args:
+    root: Directory to walk
+
+Returns:
+    Iterator over the DirEntry of each file
+"""
+def iter_files(root: Union[str, os.PathLike]) -> Iterator[os.DirEntry]:
+    stack = [os.fspath(root)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except PermissionError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+
+"""
+Get the extension of a file name without the leading dot.
+
+Equivalent to pathlib.PurePath(name).suffix[1:] without building a path
+object: dotfiles such as '.bashrc' have no extension.
+
+Args:
+    name: File name
+
+Returns:
+    The extension, or an empty string if the name has none
+"""
+def file_extension(name: str) -> str:
+    stem, _, extension = name.rpartition('.')
+    return extension if stem else ''
@@ -1,8 +1,76 @@
 import os
+import sys
+import errno
 import pathlib
 import shutil
 import json
-from typing import Dict, List, Optional
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Union
+
+from .file_walker import file_extension, iter_files
+
+"""Move a file, renaming it in place whenever possible.
+
+    On the same filesystem the move is a single os.replace. Only when the
+    rename fails with EXDEV is the file copied with its metadata and the
+    source removed.
+
+    Args:
+        source (str): Current path of the file.
+        destination (str): New path of the file.
+
+    Raises:
+        OSError: If the file cannot be moved
+"""
+def _move_file(source: str, destination: str) -> None:
+    try:
+        os.replace(source, destination)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        # Source and destination are on different filesystems
+        _fast_copy(source, destination)
+        os.unlink(source)
+
+"""Copy a file and its metadata with an in-kernel copy where available.
+
+    Uses CopyFile2 on Windows and shutil.copyfile elsewhere, which already
+    copies with sendfile on Linux and fcopyfile on macOS and falls back to
+    a buffered copy when the filesystem does not support them. File
+    metadata is preserved as with shutil.copy2. A partial copy at a new
+    destination is removed before the error is raised, and the caller never
+    deletes the source after an incomplete copy.
+
+    Args:
+        source (str): Path of the file to copy.
+        destination (str): Path of the copy.
+
+    Raises:
+        OSError: If the file cannot be copied
+"""
+def _fast_copy(source: str, destination: str) -> None:
+    existed = os.path.lexists(destination)
+    try:
+        if sys.platform == 'win32':
+            import ctypes
+            from ctypes import wintypes
+            copy_file2 = ctypes.windll.kernel32.CopyFile2
+            copy_file2.argtypes = [wintypes.LPCWSTR, wintypes.LPCWSTR, ctypes.c_void_p]
+            # An HRESULT restype makes ctypes raise OSError on failure
+            copy_file2.restype = ctypes.HRESULT
+            copy_file2(source, destination, None)
+        else:
+            shutil.copyfile(source, destination)
+        
+        shutil.copystat(source, destination)
+    except BaseException:
+        if not existed:
+            try:
+                os.unlink(destination)
+            except OSError:
+                pass
+        raise
 
 """Intelligent folder reorganization engine for file management.
 
@@ -13,7 +81,8 @@ or rolling back reorganization.
 
 Attributes:
     config (dict): Configuration for folder reorganization rules.
-    _previous_state (dict): Tracks file locations before reorganization.
+    _previous_state (dict): Maps the new location of each moved file to
+        its location before reorganization.
 """
 class FolderReorganizer:
 
@@ -34,6 +103,9 @@ class FolderReorganizer:
         
         # Tracking for undo functionality
         self._previous_state = {}
+        
+        # Category directories already created, to skip repeated mkdir calls
+        self._known_dirs = set()
 
     """Load reorganization configuration from JSON file.
 
@@ -53,7 +125,7 @@ class FolderReorganizer:
         if config_path is None:
             config_path = os.path.join(
                 os.path.dirname(__file__), 
-                '..', 'resources', 'reorganization_config.json'
+                'resources', 'reorganization_config.json'
             )
         
         # Load and validate configuration
@@ -65,49 +137,113 @@ class FolderReorganizer:
         for key in required_keys:
             if key not in self.config:
                 raise ValueError(f"Missing required configuration key: {key}")
+        
+        # Normalize rule extensions into sets for constant-time membership
+        for rule in self.config['hierarchy_rules']:
+            if 'extensions' in rule:
+                rule['extensions'] = frozenset(e.lower().lstrip('.') for e in rule['extensions'])
+        
+        # Precompile the leading extension-only rules into a single lookup.
+        # The first rule with other conditions, and every rule after it,
+        # is evaluated in order for files the lookup does not match.
+        self._ext_to_category = {}
+        self._fallback_rules = []
+        
+        # Categories resolved by the fallback rules, memoized per extension
+        self._ext_cache = {}
+        rules = self.config['hierarchy_rules']
+        for index, rule in enumerate(rules):
+            if 'extensions' not in rule:
+                self._fallback_rules = rules[index:]
+                break
+            for extension in rule['extensions']:
+                self._ext_to_category.setdefault(extension, rule.get('category', 'Uncategorized'))
     
     """Generate an intelligent folder hierarchy based on file characteristics.
 
         Scans the source directory and categorizes files according to the
         configured hierarchy rules. Creates a mapping of categories to files.
+        Top-level subdirectories are scanned concurrently, one thread per
+        subtree; scandir releases the GIL, so the scans overlap.
 
         Args:
             source_directory (pathlib.Path): Directory to analyze and reorganize.
 
         Returns:
-            Dict[str, List[pathlib.Path]]: A dictionary where keys are category
+            Dict[str, List[str]]: A dictionary where keys are category
             names and values are lists of file paths belonging to those categories.
+            Paths are kept as plain strings to avoid building a path object
+            per file.
 
         Example:
             >>> reorganizer = FolderReorganizer()
             >>> hierarchy = reorganizer.generate_folder_hierarchy(Path('/path/to/files'))
             >>> print(hierarchy)
-            {'Documents': [Path('/path/to/files/report.pdf'), ...], ...}
+            {'Documents': ['/path/to/files/report.pdf', ...], ...}
     """
-    def generate_folder_hierarchy(self, source_directory: pathlib.Path) -> Dict[str, List[pathlib.Path]]:
-        # Placeholder for hierarchy generation logic
-        proposed_hierarchy = {}
+    def generate_folder_hierarchy(self, source_directory: pathlib.Path) -> Dict[str, List[str]]:
+        # Split the source directory into top-level files and subtrees.
+        # An unreadable source directory yields no files, as with Path.rglob.
+        try:
+            with os.scandir(source_directory) as entries:
+                top_entries = list(entries)
+        except PermissionError:
+            top_entries = []
+        subdirectories = [entry.path for entry in top_entries if entry.is_dir(follow_symlinks=False)]
         
-        # Scan files in the source directory
-        for file_path in source_directory.rglob('*'):
-            if file_path.is_file():
-                # Determine appropriate category based on rules
-                category = self._categorize_file(file_path)
-                
-                # Group files by category
-                if category not in proposed_hierarchy:
-                    proposed_hierarchy[category] = []
-                proposed_hierarchy[category].append(file_path)
+        # Categorize top-level files directly
+        proposed_hierarchy = defaultdict(list, self._categorize_entries(
+            entry for entry in top_entries if entry.is_file(follow_symlinks=False)
+        ))
+        
+        # Scan subtrees in parallel and merge their categories in order
+        if subdirectories:
+            with ThreadPoolExecutor(max_workers=min(32, len(subdirectories))) as executor:
+                for subtree_hierarchy in executor.map(self._scan_subtree, subdirectories):
+                    for category, files in subtree_hierarchy.items():
+                        proposed_hierarchy[category].extend(files)
+        
+        # Return a plain dict so missing categories raise as before
+        return dict(proposed_hierarchy)
+    
+    """Categorize every file below a directory.
+
+        Args:
+            directory (str): Root of the subtree to scan.
+
+        Returns:
+            Dict[str, List[str]]: Category names mapped to the file paths
+            of the subtree belonging to them.
+    """
+    def _scan_subtree(self, directory: str) -> Dict[str, List[str]]:
+        return self._categorize_entries(iter_files(directory))
+    
+    """Group directory entries of files by category.
+
+        Args:
+            entries (Iterable[os.DirEntry]): Directory entries of the files.
+
+        Returns:
+            Dict[str, List[str]]: Category names mapped to the file paths
+            belonging to them.
+    """
+    def _categorize_entries(self, entries: Iterable[os.DirEntry]) -> Dict[str, List[str]]:
+        hierarchy = defaultdict(list)
+        for entry in entries:
+            # Group files by the category determined from the rules
+            hierarchy[self._categorize_file(entry)].append(entry.path)
         
-        return proposed_hierarchy
+        return dict(hierarchy)
     
     """Categorize a file based on predefined rules and weights.
 
         Determines the appropriate category for a file by applying
-        the configured hierarchy rules in order.
+        the configured hierarchy rules in order. Extensions are matched
+        case-insensitively.
 
         Args:
-            file_path (pathlib.Path): Path to the file to categorize.
+            file_entry (Union[str, os.DirEntry, pathlib.PurePath]): Path or
+                directory entry of the file to categorize.
 
         Returns:
             str: The determined category for the file. Returns 'Uncategorized'
@@ -118,13 +254,41 @@ class FolderReorganizer:
             configuration file, typically using file extensions and
             other metadata.
     """
-    def _categorize_file(self, file_path: pathlib.Path) -> str:
+    def _categorize_file(self, file_entry: Union[str, os.DirEntry, pathlib.PurePath]) -> str:
        
+        # Derive the extension from the name without building a path object
+        name = os.path.basename(file_entry) if isinstance(file_entry, str) else file_entry.name
+        extension = file_extension(name).lower()
+        
+        # Extension-only rules resolve with a single lookup
+        category = self._ext_to_category.get(extension)
+        if category is not None:
+            return category
+        
+        # Rule conditions only depend on the extension, so the fallback
+        # rules are evaluated once per distinct extension
+        category = self._ext_cache.get(extension)
+        if category is None:
+            category = self._apply_fallback_rules(extension)
+            self._ext_cache[extension] = category
+        
+        return category
+    
+    """Find the category of an extension with the fallback rules.
+
+        Args:
+            extension (str): Lowercase extension, without the leading dot.
+
+        Returns:
+            str: Category of the first matching rule, or 'Uncategorized'.
+    """
+    def _apply_fallback_rules(self, extension: str) -> str:
+        
         # Implement categorization logic using configuration rules
         # This is a simplified version and should be expanded
-        for rule in self.config.get('hierarchy_rules', []):
+        for rule in self._fallback_rules:
             # Check rule conditions (file extension, metadata, etc.)
-            if self._check_rule_conditions(file_path, rule):
+            if self._check_rule_conditions(extension, rule):
                 return rule.get('category', 'Uncategorized')
         
         return 'Uncategorized'
@@ -135,7 +299,8 @@ class FolderReorganizer:
         specified in a reorganization rule.
 
         Args:
-            file_path (pathlib.Path): Path to the file being evaluated.
+            extension (str): Extension of the file being evaluated, without
+                the leading dot.
             rule (Dict): A dictionary containing rule conditions.
 
         Returns:
@@ -145,11 +310,11 @@ class FolderReorganizer:
             Currently supports checking file extensions. Can be extended
             to include more sophisticated rule matching in the future.
     """
-    def _check_rule_conditions(self, file_path: pathlib.Path, rule: Dict) -> bool:
+    def _check_rule_conditions(self, extension: str, rule: Dict) -> bool:
        
         # Check file extension
         if 'extensions' in rule:
-            if file_path.suffix[1:] not in rule['extensions']:
+            if extension not in rule['extensions']:
                 return False
         
         # Additional rule checking can be added here
@@ -162,8 +327,8 @@ class FolderReorganizer:
         moving any files.
 
         Args:
-            proposed_hierarchy (Dict[str, List[pathlib.Path]]): A dictionary
-                mapping category names to lists of file paths.
+            proposed_hierarchy (Dict[str, List[Union[str, os.PathLike]]]): A
+                dictionary mapping category names to lists of file paths.
 
         Example:
             >>> reorganizer = FolderReorganizer()
@@ -171,13 +336,14 @@ class FolderReorganizer:
             >>> reorganizer.preview_changes(hierarchy)
             # Prints categorized files to console
     """
-    def preview_changes(self, proposed_hierarchy: Dict[str, List[pathlib.Path]]) -> None:
+    def preview_changes(self, proposed_hierarchy: Dict[str, List[Union[str, os.PathLike]]]) -> None:
         
-        print("Proposed Folder Reorganization:")
+        # Build the whole preview and write it in one call
+        lines = ["Proposed Folder Reorganization:"]
         for category, files in proposed_hierarchy.items():
-            print(f"\nCategory: {category}")
-            for file_path in files:
-                print(f"  - {file_path}")
+            lines.append(f"\nCategory: {category}")
+            lines.extend(f"  - {file_path}" for file_path in files)
+        sys.stdout.write("\n".join(lines) + "\n")
     
     """Apply the proposed folder reorganization.
 
@@ -186,36 +352,75 @@ class FolderReorganizer:
         potential rollback.
 
         Args:
-            proposed_hierarchy (Dict[str, List[pathlib.Path]]): A dictionary
-                mapping category names to lists of file paths to be moved.
+            proposed_hierarchy (Dict[str, List[Union[str, os.PathLike]]]): A
+                dictionary mapping category names to lists of file paths to be moved.
             base_output_dir (pathlib.Path): Base directory where categorized
                 subdirectories will be created.
 
         Note:
-            - Creates category subdirectories if they don't exist
+            - Creates category subdirectories if they don't exist, once
+              per directory across calls
             - Moves files to their respective category directories
+            - Renames a file to 'name (1).ext', 'name (2).ext', ... when
+              its name is already taken in the category directory
             - Maintains a record of original file locations for rollback
 
         Raises:
             OSError: If there are issues creating directories or moving files
     """
-    def apply_reorganization(self, proposed_hierarchy: Dict[str, List[pathlib.Path]], base_output_dir: pathlib.Path):
+    def apply_reorganization(self, proposed_hierarchy: Dict[str, List[Union[str, os.PathLike]]], base_output_dir: pathlib.Path):
         
         # Track previous state for potential rollback
         self._previous_state = {}
         
-        # Create category directories and move files
+        # Create all category directories up front, skipping known ones
+        base_output_dir = os.fspath(base_output_dir)
+        category_dirs = {category: os.path.join(base_output_dir, category) for category in proposed_hierarchy}
+        for category_dir in category_dirs.values():
+            if category_dir not in self._known_dirs:
+                os.makedirs(category_dir, exist_ok=True)
+                self._known_dirs.add(category_dir)
+        
+        # Move files into their category directories, working on str paths only
         for category, files in proposed_hierarchy.items():
-            category_dir = base_output_dir / category
-            category_dir.mkdir(parents=True, exist_ok=True)
+            category_dir = category_dirs[category]
             
             for file_path in files:
-                # Track original location
-                self._previous_state[file_path] = file_path
+                source = os.fspath(file_path)
+                destination = self._unique_destination(category_dir, os.path.basename(source))
                 
                 # Move file to new location
-                destination = category_dir / file_path.name
-                shutil.move(str(file_path), str(destination))
+                _move_file(source, destination)
+                
+                # Track original location, keyed by where the file went
+                self._previous_state[destination] = source
+    
+    """Find a free path for a file in a category directory.
+
+        Files with the same name from different source directories would
+        otherwise overwrite each other and could not be rolled back.
+
+        Args:
+            category_dir (str): Category directory receiving the file.
+            name (str): Name of the file.
+
+        Returns:
+            str: The path of the name in the directory, or of the first
+            numbered variant that neither exists nor was claimed by
+            this reorganization.
+    """
+    def _unique_destination(self, category_dir: str, name: str) -> str:
+        destination = os.path.join(category_dir, name)
+        extension = file_extension(name)
+        stem = name[:-len(extension) - 1] if extension else name
+        suffix = f".{extension}" if extension else ""
+        
+        counter = 0
+        while destination in self._previous_state or os.path.lexists(destination):
+            counter += 1
+            destination = os.path.join(category_dir, f"{stem} ({counter}){suffix}")
+        
+        return destination
     
     """Rollback the last reorganization to the previous state.
 
@@ -228,12 +433,14 @@ class FolderReorganizer:
                 categorized files were moved.
 
         Note:
-            - Moves files back to their original locations
-            - Clears the tracking of previous file states
+            - Moves files back to their original locations in parallel
+            - Stops tracking every file that was restored; files that
+              could not be restored stay tracked so rollback can be retried
             - Removes empty category directories
 
         Raises:
-            OSError: If there are issues moving files or removing directories
+            OSError: If any file could not be moved back, after every
+                other file has been restored
 
         Warns:
             Prints a message if no previous state exists to rollback
@@ -244,14 +451,33 @@ class FolderReorganizer:
             print("No previous state to rollback.")
             return
         
-        for original_path, current_path in self._previous_state.items():
-            # Move file back to original location
-            shutil.move(str(current_path), str(original_path))
+        # Move files back to their original locations in parallel, waiting
+        # for every move even when some of them fail
+        with ThreadPoolExecutor(max_workers=min(32, len(self._previous_state))) as executor:
+            moves = {
+                current_path: executor.submit(_move_file, current_path, original_path)
+                for current_path, original_path in self._previous_state.items()
+            }
+        
+        # Stop tracking restored files; category directories may be removed below
+        failures = []
+        for current_path, move in moves.items():
+            error = move.exception()
+            if error is None:
+                del self._previous_state[current_path]
+            else:
+                failures.append(f"{current_path}: {error}")
+        self._known_dirs.clear()
         
-        # Clear previous state
-        self._previous_state.clear()
+        # Optional: Remove empty category directories. rmdir fails fast on
+        # non-empty directories, which is cheaper than listing them first.
+        with os.scandir(base_output_dir) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    try:
+                        os.rmdir(entry.path)
+                    except OSError:
+                        pass
         
-        # Optional: Remove empty category directories
-        for category_dir in base_output_dir.iterdir():
-            if category_dir.is_dir() and not any(category_dir.iterdir()):
-                category_dir.rmdir()
+        if failures:
+            raise OSError(f"Failed to restore {len(failures)} file(s):\n" + "\n".join(failures))
@@ -1,12 +1,8 @@
-import os
 import sys
 import pathlib
 import argparse
 
-# Add the current directory to Python path to import local modules
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-
-from file_processor import process_files
+from .file_processor import process_files
 
 """
 Main entry point for the file analysis CLI.
@@ -26,6 +22,12 @@ def main():
         type=pathlib.Path, 
         help='Optional output directory for analysis results'
     )
+    parser.add_argument(
+        '-j', '--processes', 
+        type=int, 
+        default=1,
+        help='Number of worker processes for CPU inference (default: 1)'
+    )
     
     # Parse arguments
     args = parser.parse_args()
@@ -36,7 +38,7 @@ def main():
         sys.exit(1)
     
     # Process files
-    results = process_files(args.directory, args.output)
+    results = process_files(args.directory, args.output, args.processes)
     
     # Print summary
     print(f"Analyzed {len(results)} files.")
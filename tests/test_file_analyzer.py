@@ -1,14 +1,15 @@
 import pytest
 import pathlib
 import tempfile
+import datetime
 import os
 
-from src.file_analyzer import FileAnalyzer
+from src.file_analyzer import MAX_CONTENT_BYTES, FileAnalyzer
 
 @pytest.fixture
 def file_analyzer():
     """Fixture to create a FileAnalyzer instance for testing."""
-    return FileAnalyzer()
+    return FileAnalyzer(cache_dir='')
 
 @pytest.fixture
 def sample_text_file():
@@ -42,6 +43,7 @@ def test_extract_metadata(file_analyzer, sample_text_file):
     
     assert metadata['extension'] == '.txt'
     assert metadata['name'] == sample_text_file.name.split('/')[-1]
+    assert metadata['year'] == datetime.datetime.fromtimestamp(metadata['created']).year
 
 def test_classify_file_purpose(file_analyzer, sample_text_file):
     """Test file purpose classification."""
@@ -95,6 +97,120 @@ def test_classification_multi_label(file_analyzer):
     assert len(purposes) > 1
     assert all(purpose in file_analyzer.purpose_categories for purpose in purposes)
 
+def test_read_content_skips_binary_files(file_analyzer, tmp_path):
+    """Test that files with NUL bytes in their head are read as empty."""
+    binary_file = tmp_path / 'data.dat'
+    binary_file.write_bytes(b'header\x00' + b'x' * 10000)
+    
+    assert file_analyzer.read_content(binary_file) == ""
+
+def test_read_content_limits_size(file_analyzer, tmp_path):
+    """Test that text files are read past the sniffed head, up to the size limit."""
+    text_file = tmp_path / 'notes.txt'
+    text_file.write_text('a' * (MAX_CONTENT_BYTES + 100))
+    
+    assert file_analyzer.read_content(text_file) == 'a' * MAX_CONTENT_BYTES
+
+@pytest.fixture
+def stub_scores(monkeypatch):
+    """Replace zero-shot inference with fixed scores and record each call."""
+    calls = []
+    def zero_shot_scores(self, file_contents):
+        calls.append(list(file_contents))
+        return [{category: 0.9 for category in self.purpose_categories} for _ in file_contents]
+    monkeypatch.setattr(FileAnalyzer, '_zero_shot_scores', zero_shot_scores)
+    return calls
+
+def test_classification_cache_hit(stub_scores):
+    """Test that repeated contents are scored by the model only once."""
+    analyzer = FileAnalyzer(cache_dir='')
+    
+    first = analyzer.classify_file_purposes(["quarterly report", "holiday photos"])
+    second = analyzer.classify_file_purposes(["holiday photos", "new content"])
+    
+    assert stub_scores == [["quarterly report", "holiday photos"], ["new content"]]
+    assert second[0] == first[1]
+
+def test_classification_cache_persists(stub_scores, tmp_path):
+    """Test that cached scores survive closing and reopening the cache."""
+    with FileAnalyzer(cache_dir=str(tmp_path)) as analyzer:
+        analyzer.classify_file_purpose("quarterly report")
+    
+    with FileAnalyzer(cache_dir=str(tmp_path)) as analyzer:
+        assert analyzer.classify_file_purpose("quarterly report")
+    
+    assert stub_scores == [["quarterly report"]]
+
+def test_classification_cache_eviction():
+    """Test that the in-memory cache evicts the least recently used entry."""
+    analyzer = FileAnalyzer(cache_dir='', cache_size=2)
+    
+    analyzer._cache_put('a', {'Work': 0.1})
+    analyzer._cache_put('b', {'Work': 0.2})
+    assert analyzer._cache_get('a') == {'Work': 0.1}
+    analyzer._cache_put('c', {'Work': 0.3})
+    
+    assert analyzer._cache_get('b') is None
+    assert analyzer._cache_get('a') == {'Work': 0.1}
+    assert analyzer._cache_get('c') == {'Work': 0.3}
+
+def test_classification_cache_salt():
+    """Test that cache keys depend on the model, its backend and the categories."""
+    analyzer = FileAnalyzer(cache_dir='')
+    key = analyzer._cache_key("quarterly report")
+    
+    assert FileAnalyzer(cache_dir='')._cache_key("quarterly report") == key
+    assert FileAnalyzer(cache_dir='', model_id='other/model')._cache_key("quarterly report") != key
+    
+    analyzer._zero_shot_backend = 'other-backend'
+    analyzer._cache_salt = analyzer._make_cache_salt()
+    assert analyzer._cache_key("quarterly report") != key
+    
+    analyzer = FileAnalyzer(cache_dir='')
+    analyzer.purpose_categories = analyzer.purpose_categories[:-1]
+    analyzer._cache_salt = analyzer._make_cache_salt()
+    assert analyzer._cache_key("quarterly report") != key
+
+@pytest.fixture
+def stub_export(monkeypatch):
+    """Replace the int8 ONNX export with a stub and record each export."""
+    exports = []
+    def export_quantized_model(self, save_dir):
+        exports.append(save_dir)
+        pathlib.Path(save_dir, 'model_quantized.onnx').write_bytes(b'onnx')
+    monkeypatch.setattr(FileAnalyzer, '_export_quantized_model', export_quantized_model)
+    return exports
+
+def make_quantizing_analyzer(models_path):
+    """Create an analyzer that uses the int8 ONNX backend, whether or not optimum is installed."""
+    analyzer = FileAnalyzer(models_path=str(models_path), cache_dir='')
+    analyzer._zero_shot_backend = 'onnx-int8'
+    return analyzer
+
+def test_quantized_model_exported_once(stub_export, tmp_path):
+    """Test that the quantized model is exported once per models_path."""
+    first = make_quantizing_analyzer(tmp_path / 'a').prepare_quantized_model()
+    second = make_quantizing_analyzer(tmp_path / 'a').prepare_quantized_model()
+    make_quantizing_analyzer(tmp_path / 'b').prepare_quantized_model()
+    
+    assert len(stub_export) == 2
+    assert first == second
+    assert (pathlib.Path(first) / 'model_quantized.onnx').read_bytes() == b'onnx'
+    # Only the final model directory is left behind
+    assert [p.name for p in (tmp_path / 'a').iterdir()] == [pathlib.Path(first).name]
+
+def test_quantized_model_replaces_incomplete_export(stub_export, tmp_path):
+    """Test that a directory left by an interrupted export is rebuilt."""
+    analyzer = make_quantizing_analyzer(tmp_path)
+    incomplete = tmp_path / (analyzer.model_id.replace('/', '--') + '-int8')
+    incomplete.mkdir(parents=True)
+    (incomplete / 'model.onnx').write_bytes(b'partial')
+    
+    quantized_path = analyzer.prepare_quantized_model()
+    
+    assert len(stub_export) == 1
+    assert sorted(p.name for p in pathlib.Path(quantized_path).iterdir()) == ['model_quantized.onnx']
+
 # Optional: Performance and memory usage test
 def test_file_analyzer_performance(file_analyzer, sample_text_file):
     """Basic performance test to ensure analysis doesn't take too long."""
@@ -0,0 +1,76 @@
+import json
+import pytest
+import pathlib
+import tempfile
+
+from src.file_analyzer import FileAnalyzer
+from src.file_processor import ANALYSES_FILENAME, _iter_text_files, process_files
+
+@pytest.fixture
+def stub_scores(monkeypatch, tmp_path):
+    """Replace zero-shot inference with fixed scores and record each call."""
+    # Keep the classification cache out of the user's home directory
+    monkeypatch.setenv('HOME', str(tmp_path))
+    calls = []
+    def zero_shot_scores(self, file_contents):
+        calls.append(list(file_contents))
+        return [{category: 0.9 for category in self.purpose_categories} for _ in file_contents]
+    monkeypatch.setattr(FileAnalyzer, '_zero_shot_scores', zero_shot_scores)
+    return calls
+
+@pytest.fixture
+def source_directory():
+    """Create a temporary directory tree of text files."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = pathlib.Path(temp_dir)
+        for i in range(70):
+            subdirectory = root / f'folder{i % 3}'
+            subdirectory.mkdir(exist_ok=True)
+            (subdirectory / f'note{i}.txt').write_text(f"Meeting notes number {i}")
+        yield root
+
+def test_process_files_writes_ndjson(stub_scores, source_directory, tmp_path):
+    """Test that every analysis is saved as one JSON line, in scan order."""
+    output_dir = tmp_path / 'results'
+    results = process_files(source_directory, output_dir)
+
+    lines = (output_dir / ANALYSES_FILENAME).read_text().splitlines()
+
+    assert len(lines) == 70
+    assert [json.loads(line) for line in lines] == results
+    assert [result['path'] for result in results] == [entry.path for entry in _iter_text_files(source_directory)]
+    assert all(result['purposes'] for result in results)
+
+def test_process_files_binary_content(stub_scores, source_directory):
+    """Test that files with binary content are analyzed without being classified."""
+    (source_directory / 'data.dat').write_bytes(b'\x00\x01\x02')
+
+    results = {pathlib.Path(result['path']).name: result for result in process_files(source_directory)}
+
+    assert results['data.dat']['purposes'] == {}
+    assert results['data.dat']['content_preview'] == ""
+    assert all('\x00' not in content for call in stub_scores for content in call)
+
+def test_process_files_skips_binary_extensions(stub_scores, source_directory):
+    """Test that files with a known binary extension are not analyzed."""
+    (source_directory / 'folder0' / 'photo.PNG').write_bytes(b'\x89PNG')
+    (source_directory / 'archive.zip').write_bytes(b'PK')
+
+    names = {pathlib.Path(result['path']).name for result in process_files(source_directory)}
+
+    assert len(names) == 70
+    assert 'photo.PNG' not in names
+    assert 'archive.zip' not in names
+
+def test_process_files_rerun_uses_cache(stub_scores, source_directory):
+    """Test that a second run over unchanged files does not call the model."""
+    first = process_files(source_directory)
+    calls = len(stub_scores)
+    second = process_files(source_directory)
+
+    assert calls > 0
+    assert len(stub_scores) == calls
+    assert [result['purposes'] for result in second] == [result['purposes'] for result in first]
+
+if __name__ == '__main__':
+    pytest.main([__file__])
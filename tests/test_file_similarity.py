@@ -8,7 +8,7 @@ from src.file_analyzer import FileAnalyzer
 @pytest.fixture
 def file_analyzer():
     """Fixture to create a FileAnalyzer instance for testing."""
-    return FileAnalyzer()
+    return FileAnalyzer(cache_dir='')
 
 @pytest.fixture
 def sample_files():
@@ -0,0 +1,220 @@
+import os
+import errno
+import shutil
+import json
+import pytest
+import pathlib
+import tempfile
+
+from src.folder_reorganizer import FolderReorganizer, _move_file
+
+@pytest.fixture
+def reorganizer():
+    """Fixture to create a FolderReorganizer instance for testing."""
+    return FolderReorganizer()
+
+@pytest.fixture
+def source_directory():
+    """Create a temporary directory tree with files of several types."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = pathlib.Path(temp_dir)
+        (root / 'nested' / 'deeper').mkdir(parents=True)
+
+        (root / 'report.txt').write_text("Quarterly report")
+        (root / 'nested' / 'script.py').write_text("print('hello')")
+        (root / 'nested' / 'deeper' / 'photo.JPG').write_bytes(b'\xff\xd8\xff')
+        (root / 'notes').write_text("No extension")
+
+        yield root
+
+def test_generate_folder_hierarchy(reorganizer, source_directory):
+    """Test that files in all subdirectories are categorized by extension."""
+    hierarchy = reorganizer.generate_folder_hierarchy(source_directory)
+
+    names = {category: sorted(pathlib.Path(p).name for p in files) for category, files in hierarchy.items()}
+    assert names == {
+        'Documents': ['report.txt'],
+        'Code': ['script.py'],
+        'Images': ['photo.JPG'],
+        'Uncategorized': ['notes'],
+    }
+
+def test_unreadable_directory_is_skipped(reorganizer, source_directory, monkeypatch):
+    """Test that a directory that cannot be listed does not stop the scan."""
+    (source_directory / 'locked').mkdir()
+    (source_directory / 'locked' / 'secret.txt').write_text("Hidden")
+    locked = str(source_directory / 'locked')
+
+    scandir = os.scandir
+    def guarded_scandir(path='.'):
+        if os.fspath(path) == locked:
+            raise PermissionError(13, 'Permission denied', locked)
+        return scandir(path)
+    monkeypatch.setattr(os, 'scandir', guarded_scandir)
+
+    hierarchy = reorganizer.generate_folder_hierarchy(source_directory)
+
+    assert sorted(pathlib.Path(p).name for files in hierarchy.values() for p in files) == [
+        'notes', 'photo.JPG', 'report.txt', 'script.py'
+    ]
+
+def test_cross_device_move_failure_keeps_source(monkeypatch, tmp_path):
+    """Test that a failed cross-device copy leaves the source and no partial copy."""
+    source = tmp_path / 'report.txt'
+    source.write_text("Quarterly report")
+    destination = tmp_path / 'Documents' / 'report.txt'
+    destination.parent.mkdir()
+
+    def replace(src, dst):
+        raise OSError(errno.EXDEV, 'Invalid cross-device link')
+    def copyfile(src, dst):
+        pathlib.Path(dst).write_text("Quart")
+        raise OSError(errno.EIO, 'Input/output error')
+    monkeypatch.setattr(os, 'replace', replace)
+    monkeypatch.setattr(shutil, 'copyfile', copyfile)
+
+    with pytest.raises(OSError):
+        _move_file(str(source), str(destination))
+
+    assert source.read_text() == "Quarterly report"
+    assert not destination.exists()
+
+def test_cross_device_move_copies_and_removes_source(monkeypatch, tmp_path):
+    """Test that a cross-device move copies the file with its metadata."""
+    source = tmp_path / 'report.txt'
+    source.write_text("Quarterly report")
+    os.utime(source, (1000000000, 1000000000))
+    destination = tmp_path / 'report-copy.txt'
+
+    def replace(src, dst):
+        raise OSError(errno.EXDEV, 'Invalid cross-device link')
+    monkeypatch.setattr(os, 'replace', replace)
+
+    _move_file(str(source), str(destination))
+
+    assert not source.exists()
+    assert destination.read_text() == "Quarterly report"
+    assert destination.stat().st_mtime == 1000000000
+
+def test_rule_extensions_are_normalized():
+    """Test that rule extensions match regardless of case or leading dot."""
+    config = {
+        "hierarchy_rules": [
+            {"category": "Images", "extensions": [".PNG"]},
+            {"category": "Misc"},
+            {"category": "Data", "extensions": [".Csv"]}
+        ],
+        "classification_weights": {}
+    }
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+        json.dump(config, f)
+    try:
+        reorganizer = FolderReorganizer(f.name)
+    finally:
+        os.unlink(f.name)
+
+    assert reorganizer.config['hierarchy_rules'][0]['extensions'] == frozenset({'png'})
+    assert reorganizer._categorize_file('image.png') == 'Images'
+    assert reorganizer._check_rule_conditions('csv', reorganizer.config['hierarchy_rules'][2])
+    assert reorganizer._categorize_file('data.csv') == 'Misc'
+
+def test_preview_changes(reorganizer, capsys):
+    """Test that the preview lists every file under its category."""
+    reorganizer.preview_changes({'Documents': ['a.txt', 'b.pdf'], 'Code': ['c.py']})
+
+    assert capsys.readouterr().out == (
+        "Proposed Folder Reorganization:\n"
+        "\nCategory: Documents\n"
+        "  - a.txt\n"
+        "  - b.pdf\n"
+        "\nCategory: Code\n"
+        "  - c.py\n"
+    )
+
+def test_apply_and_rollback(reorganizer, source_directory):
+    """Test that rollback restores files moved by apply_reorganization."""
+    original_files = sorted(p for p in source_directory.rglob('*') if p.is_file())
+    hierarchy = reorganizer.generate_folder_hierarchy(source_directory)
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        output_dir = pathlib.Path(output_dir)
+        reorganizer.apply_reorganization(hierarchy, output_dir)
+
+        assert (output_dir / 'Documents' / 'report.txt').is_file()
+        assert (output_dir / 'Images' / 'photo.JPG').is_file()
+        assert not any(p.exists() for p in original_files)
+
+        reorganizer.rollback(output_dir)
+
+        assert sorted(p for p in source_directory.rglob('*') if p.is_file()) == original_files
+        assert list(output_dir.iterdir()) == []
+
+def test_rollback_restores_remaining_files_on_failure(reorganizer, source_directory):
+    """Test that one failed restore neither stops the others nor blocks a retry."""
+    hierarchy = reorganizer.generate_folder_hierarchy(source_directory)
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        output_dir = pathlib.Path(output_dir)
+        reorganizer.apply_reorganization(hierarchy, output_dir)
+
+        # Remove the original directory of one file so it cannot be restored
+        (source_directory / 'nested' / 'deeper').rmdir()
+
+        with pytest.raises(OSError, match='photo.JPG'):
+            reorganizer.rollback(output_dir)
+
+        assert (source_directory / 'report.txt').is_file()
+        assert (source_directory / 'nested' / 'script.py').is_file()
+        assert (source_directory / 'notes').is_file()
+        assert list(reorganizer._previous_state) == [str(output_dir / 'Images' / 'photo.JPG')]
+
+        (source_directory / 'nested' / 'deeper').mkdir()
+        reorganizer.rollback(output_dir)
+
+        assert (source_directory / 'nested' / 'deeper' / 'photo.JPG').is_file()
+        assert list(output_dir.iterdir()) == []
+
+def test_apply_with_colliding_names(reorganizer, tmp_path):
+    """Test that files sharing a name are kept apart and restored by rollback."""
+    source_directory = tmp_path / 'source'
+    for folder in ('a', 'b', 'c'):
+        (source_directory / folder).mkdir(parents=True)
+        (source_directory / folder / 'notes.txt').write_text(f"Notes from {folder}")
+    output_dir = tmp_path / 'output'
+    (output_dir / 'Documents').mkdir(parents=True)
+    (output_dir / 'Documents' / 'notes.txt').write_text("Already organized")
+
+    reorganizer.apply_reorganization(reorganizer.generate_folder_hierarchy(source_directory), output_dir)
+
+    documents = output_dir / 'Documents'
+    assert sorted(p.name for p in documents.iterdir()) == [
+        'notes (1).txt', 'notes (2).txt', 'notes (3).txt', 'notes.txt'
+    ]
+    assert (documents / 'notes.txt').read_text() == "Already organized"
+
+    reorganizer.rollback(output_dir)
+
+    for folder in ('a', 'b', 'c'):
+        assert (source_directory / folder / 'notes.txt').read_text() == f"Notes from {folder}"
+    assert [p.name for p in documents.iterdir()] == ['notes.txt']
+
+def test_apply_after_rollback(reorganizer, source_directory):
+    """Test that category directories removed by rollback are recreated."""
+    with tempfile.TemporaryDirectory() as output_dir:
+        output_dir = pathlib.Path(output_dir)
+        reorganizer.apply_reorganization(reorganizer.generate_folder_hierarchy(source_directory), output_dir)
+        reorganizer.rollback(output_dir)
+
+        reorganizer.apply_reorganization(reorganizer.generate_folder_hierarchy(source_directory), output_dir)
+
+        assert (output_dir / 'Documents' / 'report.txt').is_file()
+
+def test_rollback_without_previous_state(reorganizer, capsys):
+    """Test that rollback without a reorganization only reports it."""
+    with tempfile.TemporaryDirectory() as output_dir:
+        reorganizer.rollback(pathlib.Path(output_dir))
+
+    assert "No previous state to rollback." in capsys.readouterr().out
+
+if __name__ == '__main__':
+    pytest.main([__file__])